@@ -4,12 +4,39 @@
 from __future__ import annotations
 
 import argparse
+import glob
+import hashlib
+import json
+import os
+import re
 import sqlite3
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import partial
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 
 import pandas as pd
+from openpyxl import Workbook
+
+try:
+    import python_calamine  # noqa: F401
+except ImportError:
+    EXCEL_ENGINE = "openpyxl"
+else:
+    # The Rust-backed calamine reader is much faster than openpyxl's XML walk.
+    EXCEL_ENGINE = "calamine"
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:
+    PYARROW_AVAILABLE = False
+else:
+    PYARROW_AVAILABLE = True
 
 
 SCHEMA_SQL = """
@@ -53,6 +80,28 @@ CREATE TABLE IF NOT EXISTS desk_review_findings (
 );
 """
 
+# The reports look rows up by district, newest year_end first. The cost_reports
+# index also carries the summed columns so the summary is read from the index
+# alone. Indexes are built after the bulk load, which is cheaper than keeping
+# them up to date row by row.
+INDEX_STATEMENTS = [
+    """
+    CREATE INDEX IF NOT EXISTS idx_cost_reports_district_year
+    ON cost_reports (
+        district_name, year_end DESC,
+        salary, healthcare, retirement, state_pct, federal_pct
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_contact_info_district_year
+    ON contact_info (district_name, year_end DESC)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_desk_review_findings_district_year
+    ON desk_review_findings (district_name, year_end DESC)
+    """,
+]
+
 
 STATE_SALARY_THRESHOLD = 60000
 HEALTHCARE_THRESHOLD = 0.07
@@ -63,6 +112,71 @@ FINDING_1_TEMPLATE = (
 )
 FINDING_2_TEXT = "District charged healthcare costs over 7% of total salaries."
 
+SALARY_COLUMNS = [
+    "district_name",
+    "year_end",
+    "employee_name",
+    "salary",
+    "healthcare",
+    "retirement",
+    "federal_pct",
+    "state_pct",
+    "source_file",
+]
+CONTACT_COLUMNS = [
+    "district_name",
+    "year_end",
+    "contact_name",
+    "contact_email",
+    "source_file",
+]
+DESK_REVIEW_COLUMNS = [
+    "district_name",
+    "year_end",
+    "report_id",
+    "finding_1_text",
+    "finding_1_x",
+    "finding_1_y",
+    "finding_2_text",
+    "finding_2_flag",
+    "healthcare_pct_of_total_salary",
+    "state_salary_threshold",
+    "healthcare_threshold",
+]
+
+COST_REPORT_COLUMNS = SALARY_COLUMNS + ["validation_passed", "validation_errors"]
+
+
+def _insert_sql(table: str, columns: Sequence[str]) -> str:
+    placeholders = ", ".join("?" for _ in columns)
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+
+
+# Built once from the column lists so the SQL and the bound tuples cannot
+# drift apart. Rows are bound positionally straight from itertuples().
+INSERT_COST_REPORT = _insert_sql("cost_reports", COST_REPORT_COLUMNS)
+INSERT_CONTACT_INFO = _insert_sql("contact_info", CONTACT_COLUMNS)
+INSERT_DESK_REVIEW = _insert_sql("desk_review_findings", DESK_REVIEW_COLUMNS)
+
+# Characters stripped from amount cells before numeric conversion ("$1,200 ").
+_NUM_CLEAN = re.compile(r"[$,\s]")
+
+# Characters that force a CSV field to be quoted.
+_CSV_SPECIAL = re.compile(r'[",\r\n]')
+
+# Below this many workbooks, threads beat the cost of spawning worker processes.
+PROCESS_POOL_MIN_WORKBOOKS = 8
+# Workbooks parsed ahead of the caller, per worker.
+IN_FLIGHT_PER_WORKER = 2
+
+# Part of every cache key; bump it whenever a change alters the parsed rows so
+# entries written by older code are not reused.
+CACHE_VERSION = 1
+
+# Metadata labels sit at the top of the Input Data tab, so only read this many rows.
+INPUT_DATA_MAX_ROWS = 32
+METADATA_LABELS = {"district name", "year end", "contact name", "contact email"}
+
 
 @dataclass
 class ReportMetadata:
@@ -78,33 +192,48 @@ def discover_workbooks(data_dir: Path) -> List[Path]:
     )
 
 
-def parse_input_metadata(workbook: Path) -> ReportMetadata:
-    df = pd.read_excel(workbook, sheet_name="Input Data", header=None)
+def _metadata_labels(df: pd.DataFrame) -> pd.Series:
+    """Return the "Label:" cells of the first column, lower-cased and indexed by row."""
+    if df.empty:
+        return pd.Series(dtype=object)
+    keys = df.iloc[:, 0].astype(str)
+    keys = keys[keys.str.endswith(":")]
+    return keys.str[:-1].str.strip().str.lower()
+
+
+def parse_input_metadata(workbook: Path, excel: pd.ExcelFile) -> ReportMetadata:
+    df = excel.parse(sheet_name="Input Data", header=None, nrows=INPUT_DATA_MAX_ROWS)
+    if len(df) == INPUT_DATA_MAX_ROWS and not METADATA_LABELS <= set(
+        _metadata_labels(df)
+    ):
+        # Some labels may sit below the bounded read; fall back to the full sheet.
+        df = excel.parse(sheet_name="Input Data", header=None)
     df = df.dropna(how="all")
 
+    labels = _metadata_labels(df)
+    if df.shape[1] > 1:
+        values = df.iloc[:, 1].loc[labels.index].dropna()
+    else:
+        values = pd.Series(dtype=object)
+    # Later rows win when a label repeats, matching a top-to-bottom read.
+    lookup = dict(zip(labels.loc[values.index], values))
+
     district_name: Optional[str] = None
     year_end_value: Optional[str] = None
     contact_name: Optional[str] = None
     contact_email: Optional[str] = None
 
-    for _, row in df.iterrows():
-        key_cell = row.iloc[0]
-        if isinstance(key_cell, str) and key_cell.endswith(":"):
-            label = key_cell[:-1].strip().lower()
-            value = row.iloc[1] if len(row) > 1 else None
-            if pd.isna(value):
-                value = None
-            if label == "district name" and value is not None:
-                district_name = str(value).strip()
-            elif label == "year end" and value is not None:
-                try:
-                    year_end_value = pd.to_datetime(value).date().isoformat()
-                except Exception:
-                    year_end_value = str(value)
-            elif label == "contact name" and value is not None:
-                contact_name = str(value).strip()
-            elif label == "contact email" and value is not None:
-                contact_email = str(value).strip()
+    if "district name" in lookup:
+        district_name = str(lookup["district name"]).strip()
+    if "year end" in lookup:
+        try:
+            year_end_value = pd.to_datetime(lookup["year end"]).date().isoformat()
+        except Exception:
+            year_end_value = str(lookup["year end"])
+    if "contact name" in lookup:
+        contact_name = str(lookup["contact name"]).strip()
+    if "contact email" in lookup:
+        contact_email = str(lookup["contact email"]).strip()
 
     if not district_name:
         district_name = workbook.stem.replace("Salary_Report_", "").replace("_", " ")
@@ -119,122 +248,124 @@ def parse_input_metadata(workbook: Path) -> ReportMetadata:
     )
 
 
-def _as_number(value) -> Optional[float]:
-    if pd.isna(value):
-        return None
-    if isinstance(value, (int, float)):
-        return float(value)
-    try:
-        sanitized = str(value).replace("$", "").replace(",", "").strip()
-        return float(sanitized)
-    except Exception:
-        return None
+def _column(df: pd.DataFrame, name: str) -> pd.Series:
+    if name in df.columns:
+        return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
 
 
-def _as_fraction(value) -> Optional[float]:
-    number = _as_number(value)
-    if number is None:
-        return None
-    if number > 1:
-        return number / 100.0
+def _as_number(column: pd.Series) -> pd.Series:
+    number = pd.to_numeric(column, errors="coerce").astype(float)
+    # Only cells that did not convert directly (e.g. "$1,200") need cleanup.
+    text = column[number.isna() & column.notna()].astype(str)
+    if not text.empty:
+        sanitized = text.str.replace(_NUM_CLEAN, "", regex=True)
+        number.loc[text.index] = pd.to_numeric(sanitized, errors="coerce")
     return number
 
 
-def safe_number(value: Optional[float]) -> float:
-    return float(value) if value is not None else 0.0
+def _as_fraction(column: pd.Series) -> pd.Series:
+    number = _as_number(column)
+    # Whole-number percentages such as 75 are stored as 0.75.
+    return number.where(number <= 1, number / 100.0)
 
 
-def calculate_employee_metrics(record: dict) -> dict:
+def calculate_employee_metrics(records: pd.DataFrame) -> pd.DataFrame:
     """Compute per-employee desk review metrics using extracted fields."""
 
-    salary = safe_number(record.get("salary"))
-    healthcare = safe_number(record.get("healthcare"))
-    retirement = safe_number(record.get("retirement"))
+    salary = records["salary"].fillna(0.0)
+    healthcare = records["healthcare"].fillna(0.0)
+    retirement = records["retirement"].fillna(0.0)
     total_payroll = salary + healthcare + retirement
 
-    state_pct = record.get("state_pct") or 0.0
-    federal_pct = record.get("federal_pct") or 0.0
+    state_pct = records["state_pct"].fillna(0.0)
+    federal_pct = records["federal_pct"].fillna(0.0)
 
     # Percentages in the workbook describe how salary dollars were funded,
     # so the state/federal portions are calculated on salary only.
     state_portion = salary * state_pct
     federal_portion = salary * federal_pct
 
-    healthcare_pct_total = (healthcare / total_payroll) if total_payroll else 0.0
-    retirement_pct_total = (retirement / total_payroll) if total_payroll else 0.0
-
-    return {
-        "total_payroll_costs": total_payroll,
-        "state_portion_of_total_payroll_costs": state_portion,
-        "federal_portion_of_total_payroll_costs": federal_portion,
-        "healthcare_percentage_of_total_payroll_costs": healthcare_pct_total,
-        "retirement_percentage_of_total_payroll_costs": retirement_pct_total,
-    }
+    # Employees with no payroll costs get 0% rather than a division by zero.
+    payroll_divisor = total_payroll.where(total_payroll != 0)
+    healthcare_pct_total = (healthcare / payroll_divisor).fillna(0.0)
+    retirement_pct_total = (retirement / payroll_divisor).fillna(0.0)
+
+    return pd.DataFrame(
+        {
+            "total_payroll_costs": total_payroll,
+            "state_portion_of_total_payroll_costs": state_portion,
+            "federal_portion_of_total_payroll_costs": federal_portion,
+            "healthcare_percentage_of_total_payroll_costs": healthcare_pct_total,
+            "retirement_percentage_of_total_payroll_costs": retirement_pct_total,
+        }
+    )
 
 
-def perform_desk_review(records: List[dict]) -> List[dict]:
+def perform_desk_review(records: pd.DataFrame) -> pd.DataFrame:
     """Aggregate per-employee metrics into district-level desk review findings."""
 
-    grouped: Dict[tuple[str, str, str], dict] = {}
-    for record in records:
-        key = (record["district_name"], record["source_file"], record["year_end"])
-        metrics = calculate_employee_metrics(record)
-        bucket = grouped.setdefault(
-            key,
-            {
-                "total_employees": 0,
-                "over_state_threshold": 0,
-                "total_salary": 0.0,
-                "total_healthcare": 0.0,
-            },
-        )
-        bucket["total_employees"] += 1
-        if (
-            metrics["state_portion_of_total_payroll_costs"]
-            > STATE_SALARY_THRESHOLD
-        ):
-            bucket["over_state_threshold"] += 1
-        bucket["total_salary"] += safe_number(record.get("salary"))
-        bucket["total_healthcare"] += safe_number(record.get("healthcare"))
-
-    findings: List[dict] = []
-    for (district, report_id, year_end), bucket in grouped.items():
-        total_salary = bucket["total_salary"]
-        # Apply the healthcare threshold to the aggregate ratio (district totals
-        # divided by total salaries) so reviewers see report-level exposure.
-        healthcare_ratio = (
-            bucket["total_healthcare"] / total_salary if total_salary else 0.0
-        )
-        finding_2_flag = healthcare_ratio > HEALTHCARE_THRESHOLD
-        finding_1_text = FINDING_1_TEMPLATE.format(
-            x=bucket["over_state_threshold"],
-            y=bucket["total_employees"],
-            threshold=STATE_SALARY_THRESHOLD,
-        )
-        findings.append(
-            {
-                "district_name": district,
-                "year_end": year_end,
-                "report_id": report_id,
-                "finding_1_text": finding_1_text,
-                "finding_1_x": bucket["over_state_threshold"],
-                "finding_1_y": bucket["total_employees"],
-                "finding_2_text": FINDING_2_TEXT,
-                "finding_2_flag": finding_2_flag,
-                "healthcare_pct_of_total_salary": healthcare_ratio,
-                "state_salary_threshold": STATE_SALARY_THRESHOLD,
-                "healthcare_threshold": HEALTHCARE_THRESHOLD,
-            }
-        )
+    # Aggregate over a slim frame holding only the group keys and the numeric
+    # columns the findings need, rather than a copy of every record column.
+    numeric_fields = ["salary", "healthcare", "retirement", "federal_pct", "state_pct"]
+    numeric = records[numeric_fields].apply(pd.to_numeric, errors="coerce")
+    metrics = calculate_employee_metrics(numeric)
+    df = records[["district_name", "source_file", "year_end"]].assign(
+        salary=numeric["salary"].fillna(0.0),
+        healthcare=numeric["healthcare"].fillna(0.0),
+        over_state_threshold=(
+            metrics["state_portion_of_total_payroll_costs"] > STATE_SALARY_THRESHOLD
+        ),
+    )
+
+    grouped = df.groupby(
+        ["district_name", "source_file", "year_end"], sort=False, dropna=False
+    ).agg(
+        total_employees=("salary", "size"),
+        over_state_threshold=("over_state_threshold", "sum"),
+        total_salary=("salary", "sum"),
+        total_healthcare=("healthcare", "sum"),
+    )
 
+    total_salary = grouped["total_salary"]
+    # Apply the healthcare threshold to the aggregate ratio (district totals
+    # divided by total salaries) so reviewers see report-level exposure.
+    healthcare_ratio = (
+        grouped["total_healthcare"] / total_salary.where(total_salary != 0)
+    ).fillna(0.0)
+
+    findings = pd.DataFrame(
+        {
+            "district_name": grouped.index.get_level_values("district_name"),
+            "year_end": grouped.index.get_level_values("year_end"),
+            "report_id": grouped.index.get_level_values("source_file"),
+            "finding_1_text": [
+                FINDING_1_TEMPLATE.format(
+                    x=x, y=y, threshold=STATE_SALARY_THRESHOLD
+                )
+                for x, y in zip(
+                    grouped["over_state_threshold"], grouped["total_employees"]
+                )
+            ],
+            "finding_1_x": grouped["over_state_threshold"].to_numpy(),
+            "finding_1_y": grouped["total_employees"].to_numpy(),
+            "finding_2_text": FINDING_2_TEXT,
+            "finding_2_flag": (healthcare_ratio > HEALTHCARE_THRESHOLD).to_numpy(),
+            "healthcare_pct_of_total_salary": healthcare_ratio.to_numpy(),
+            "state_salary_threshold": STATE_SALARY_THRESHOLD,
+            "healthcare_threshold": HEALTHCARE_THRESHOLD,
+        }
+    )
     return findings
 
 
-def parse_salary_rows(workbook: Path, metadata: ReportMetadata) -> List[dict]:
-    df_raw = pd.read_excel(workbook, sheet_name="Salaries", header=None)
+def parse_salary_rows(
+    workbook: Path, excel: pd.ExcelFile, metadata: ReportMetadata
+) -> pd.DataFrame:
+    df_raw = excel.parse(sheet_name="Salaries", header=None)
     df_raw = df_raw.dropna(how="all")
     if len(df_raw) < 3:
-        return []
+        return pd.DataFrame(columns=SALARY_COLUMNS)
 
     header_series = df_raw.iloc[1].ffill()
     header = [str(value).strip() for value in header_series]
@@ -243,88 +374,217 @@ def parse_salary_rows(workbook: Path, metadata: ReportMetadata) -> List[dict]:
     df = df.rename(columns=lambda c: str(c).strip())
     df = df.dropna(how="all")
     if "Name" not in df.columns:
-        return []
-    df = df[df["Name"].notna()]
+        return pd.DataFrame(columns=SALARY_COLUMNS)
+    # Clean and filter names as one column operation; a single mask also avoids
+    # assigning into a filtered slice of df.
+    names = df["Name"].astype(str).str.strip()
+    keep = df["Name"].notna() & names.ne("")
+    df = df[keep]
+    if df.empty:
+        return pd.DataFrame(columns=SALARY_COLUMNS)
+
+    return pd.DataFrame(
+        {
+            "district_name": metadata.district_name,
+            "year_end": metadata.year_end,
+            "employee_name": names[keep],
+            "salary": _as_number(_column(df, "Salaries")),
+            "healthcare": _as_number(_column(df, "Healthcare")),
+            "retirement": _as_number(_column(df, "Retirement")),
+            "federal_pct": _as_fraction(_column(df, "Federal Funding %")),
+            "state_pct": _as_fraction(_column(df, "State Funding %")),
+            "source_file": workbook.name,
+        },
+        columns=SALARY_COLUMNS,
+    )
 
-    records: List[dict] = []
-    for _, row in df.iterrows():
-        employee_name = str(row.get("Name", "")).strip()
-        if not employee_name:
-            continue
-        records.append(
-            {
-                "district_name": metadata.district_name,
-                "year_end": metadata.year_end,
-                "employee_name": employee_name,
-                "salary": _as_number(row.get("Salaries")),
-                "healthcare": _as_number(row.get("Healthcare")),
-                "retirement": _as_number(row.get("Retirement")),
-                "federal_pct": _as_fraction(row.get("Federal Funding %")),
-                "state_pct": _as_fraction(row.get("State Funding %")),
-                "source_file": workbook.name,
-            }
+
+def _cache_paths(workbook: Path, cache_dir: Path) -> tuple[Path, Path]:
+    # The Excel engine is part of the key because calamine and openpyxl do not
+    # always return identical cell values.
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{CACHE_VERSION}:{EXCEL_ENGINE}:".encode())
+    hasher.update(workbook.read_bytes())
+    stem = f"{workbook.stem}-{hasher.hexdigest()}"
+    return cache_dir / f"{stem}.parquet", cache_dir / f"{stem}.contact.json"
+
+
+def _read_cached_workbook(
+    salary_path: Path, contact_path: Path
+) -> Optional[tuple[pd.DataFrame, dict]]:
+    if not (salary_path.exists() and contact_path.exists()):
+        return None
+    # An unreadable entry is treated as a miss; the workbook is parsed again
+    # and the entry rewritten.
+    try:
+        salary_rows = pd.read_parquet(salary_path)
+        contact_row = json.loads(contact_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return salary_rows, contact_row
+
+
+def _replace_atomically(path: Path, write: Callable[[Path], None]) -> None:
+    # Write next to the target and rename over it, so a run killed mid-write
+    # never leaves a truncated cache entry behind.
+    fd, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".partial"
+    )
+    os.close(fd)
+    temp_path = Path(temp_name)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_cached_workbook(
+    workbook: Path,
+    salary_path: Path,
+    contact_path: Path,
+    salary_rows: pd.DataFrame,
+    contact_row: dict,
+) -> None:
+    cache_dir = salary_path.parent
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Drop entries left behind by earlier versions of this workbook. The stem
+    # is escaped so names like "Report[1]" only match their own entries.
+    stem_pattern = glob.escape(workbook.stem)
+    for stale in cache_dir.glob(f"{stem_pattern}-{'[0-9a-f]' * 32}.*"):
+        stale.unlink(missing_ok=True)
+    # The contact file goes last: an entry only counts once both files exist.
+    _replace_atomically(
+        salary_path, lambda path: salary_rows.to_parquet(path, index=False)
+    )
+    _replace_atomically(
+        contact_path,
+        lambda path: path.write_text(json.dumps(contact_row), encoding="utf-8"),
+    )
+
+
+def _parse_one_workbook(
+    workbook: Path, cache_dir: Optional[Path] = None
+) -> tuple[pd.DataFrame, dict]:
+    if cache_dir is not None:
+        salary_path, contact_path = _cache_paths(workbook, cache_dir)
+        cached = _read_cached_workbook(salary_path, contact_path)
+        if cached is not None:
+            return cached
+
+    # Open each workbook once and read both tabs from the same handle.
+    with pd.ExcelFile(workbook, engine=EXCEL_ENGINE) as excel:
+        metadata = parse_input_metadata(workbook, excel)
+        salary_rows = parse_salary_rows(workbook, excel, metadata)
+    contact_row = {
+        "district_name": metadata.district_name,
+        "year_end": metadata.year_end,
+        "contact_name": metadata.contact_name,
+        "contact_email": metadata.contact_email,
+        "source_file": workbook.name,
+    }
+    if cache_dir is not None:
+        _write_cached_workbook(
+            workbook, salary_path, contact_path, salary_rows, contact_row
         )
-    return records
-
-
-def load_records(workbooks: Iterable[Path]) -> tuple[List[dict], List[dict]]:
-    salary_rows: List[dict] = []
-    contact_rows: List[dict] = []
-    for workbook in workbooks:
-        metadata = parse_input_metadata(workbook)
-        salary_rows.extend(parse_salary_rows(workbook, metadata))
-        contact_rows.append(
-            {
-                "district_name": metadata.district_name,
-                "year_end": metadata.year_end,
-                "contact_name": metadata.contact_name,
-                "contact_email": metadata.contact_email,
-                "source_file": workbook.name,
-            }
+    return salary_rows, contact_row
+
+
+def _make_executor(workbook_count: int, max_workers: int) -> Executor:
+    if workbook_count < PROCESS_POOL_MIN_WORKBOOKS:
+        return ThreadPoolExecutor(max_workers=max_workers)
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+
+def iter_workbooks(
+    workbooks: Iterable[Path], cache_dir: Optional[Path] = None
+) -> Iterator[tuple[Path, pd.DataFrame, dict]]:
+    """Yield (workbook, salary rows, contact row) for each workbook in order."""
+    workbooks = list(workbooks)
+    if not workbooks:
+        return
+    if not PYARROW_AVAILABLE:
+        cache_dir = None
+
+    # Workbooks are independent, so parse them in parallel, yielding results
+    # in discovery order. Only a small window of workbooks is in flight at a
+    # time: parsed frames wait in their futures until the caller takes them,
+    # so submitting everything up front would hold every workbook in memory
+    # whenever parsing outpaces the caller.
+    max_workers = min(os.cpu_count() or 1, len(workbooks))
+    with _make_executor(len(workbooks), max_workers) as executor:
+        parse = partial(_parse_one_workbook, cache_dir=cache_dir)
+        remaining = iter(workbooks)
+        in_flight = deque(
+            (workbook, executor.submit(parse, workbook))
+            for workbook in islice(remaining, IN_FLIGHT_PER_WORKER * max_workers)
         )
-    return salary_rows, contact_rows
+        while in_flight:
+            workbook, future = in_flight.popleft()
+            rows, contact_row = future.result()
+            for next_workbook in islice(remaining, 1):
+                in_flight.append((next_workbook, executor.submit(parse, next_workbook)))
+            yield workbook, rows, contact_row
 
 
 def validate_cost_reports(
-    salary_records: List[dict], workbook_paths: Sequence[Path]
-) -> tuple[List[dict], Dict[str, dict]]:
+    salary_records: pd.DataFrame, workbook_paths: Sequence[Path]
+) -> tuple[pd.DataFrame, Dict[str, dict]]:
     summary: Dict[str, dict] = {path.name: {"errors": []} for path in workbook_paths}
     amount_fields = [field for field in ("salary", "healthcare", "retirement")]
     percent_fields = [field for field in ("federal_pct", "state_pct")]
 
-    for record in salary_records:
-        errors: List[str] = []
-        source_file = record.get("source_file", "unknown")
+    vdf = salary_records
+    source_files = vdf["source_file"].fillna("unknown")
+    for source_file in source_files.unique():
         summary.setdefault(source_file, {"errors": []})
 
-        name_value = record.get("employee_name")
-        if not isinstance(name_value, str) or not name_value.strip():
-            errors.append("Missing employee name")
-
-        for field in amount_fields:
-            value = record.get(field)
-            if value is None or not isinstance(value, (int, float)):
-                errors.append(f"{field} missing or non-numeric")
-
-        percent_missing = False
-        percent_total = 0.0
-        for field in percent_fields:
-            value = record.get(field)
-            if value is None or not isinstance(value, (int, float)):
-                errors.append(f"{field} missing or non-numeric")
-                percent_missing = True
-                continue
-            if not (0 <= value <= 1):
-                errors.append(f"{field} out of range [0, 1]")
-            percent_total += value
-
-        if not percent_missing and percent_total:
-            if abs(percent_total - 1.0) > 1e-3:
-                errors.append("Percent fields must sum to 1")
-
-        record["validation_passed"] = len(errors) == 0
-        record["validation_errors"] = "; ".join(errors)
-        summary[source_file]["errors"].extend(errors)
+    # Each check is a boolean mask over all records; checks are listed in the
+    # order their messages should appear for a record.
+    names = vdf["employee_name"].astype(object)
+    is_text = names.map(type).eq(str)
+    blank_name = ~is_text | names.where(is_text, "").str.strip().eq("")
+    checks: List[tuple[pd.Series, str]] = [(blank_name, "Missing employee name")]
+    for field in amount_fields:
+        values = pd.to_numeric(vdf[field], errors="coerce")
+        checks.append((values.isna(), f"{field} missing or non-numeric"))
+
+    percents = vdf[percent_fields].apply(pd.to_numeric, errors="coerce")
+    percent_missing = percents.isna()
+    for field in percent_fields:
+        checks.append((percent_missing[field], f"{field} missing or non-numeric"))
+        out_of_range = (percents[field] < 0) | (percents[field] > 1)
+        checks.append((out_of_range, f"{field} out of range [0, 1]"))
+
+    percent_total = percents.sum(axis=1)
+    bad_total = (
+        ~percent_missing.any(axis=1)
+        & percent_total.ne(0)
+        & ((percent_total - 1.0).abs() > 1e-3)
+    )
+    checks.append((bad_total, "Percent fields must sum to 1"))
+
+    # Only failing records produce messages; stable sorting keeps the check
+    # order within each record.
+    messages = pd.concat(
+        [
+            pd.Series(message, index=mask.index[mask], dtype=object)
+            for mask, message in checks
+        ]
+    ).sort_index(kind="stable")
+    joined = messages.groupby(level=0).agg("; ".join)
+    validation_errors = joined.reindex(vdf.index, fill_value="")
+
+    salary_records = salary_records.assign(
+        validation_passed=validation_errors.eq(""),
+        validation_errors=validation_errors,
+    )
+
+    for source_file, file_messages in messages.groupby(
+        source_files.loc[messages.index], sort=False
+    ):
+        summary[source_file]["errors"].extend(file_messages.tolist())
 
     for file_name, data in summary.items():
         data["passed"] = len(data["errors"]) == 0
@@ -332,123 +592,165 @@ def validate_cost_reports(
     return salary_records, summary
 
 
-def persist_to_sqlite(
-    salary_records: List[dict],
-    contact_records: List[dict],
-    desk_review_records: List[dict],
-    database_path: Path,
-) -> None:
+def open_database(database_path: Path) -> sqlite3.Connection:
+    """Recreate the schema and leave a bulk-load transaction open on the result.
+
+    Callers insert with the insert_* helpers, call create_indexes once the
+    rows are loaded and finish with COMMIT; closing the connection without
+    committing leaves the previous database intact.
+    """
     database_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(database_path) as conn:
-        conn.execute("DROP TABLE IF EXISTS cost_reports")
-        conn.execute("DROP TABLE IF EXISTS contact_info")
-        conn.execute("DROP TABLE IF EXISTS desk_review_findings")
-        conn.executescript(SCHEMA_SQL)
-        conn.executemany(
-            """
-            INSERT INTO cost_reports (
-                district_name,
-                year_end,
-                employee_name,
-                salary,
-                healthcare,
-                retirement,
-                federal_pct,
-                state_pct,
-                source_file,
-                validation_passed,
-                validation_errors
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                (
-                    r["district_name"],
-                    r["year_end"],
-                    r["employee_name"],
-                    r["salary"],
-                    r["healthcare"],
-                    r["retirement"],
-                    r["federal_pct"],
-                    r["state_pct"],
-                    r["source_file"],
-                    1 if r.get("validation_passed") else 0,
-                    r.get("validation_errors", ""),
-                )
-                for r in salary_records
-            ],
-        )
-        conn.executemany(
-            """
-            INSERT INTO contact_info (
-                district_name,
-                year_end,
-                contact_name,
-                contact_email,
-                source_file
-            ) VALUES (?, ?, ?, ?, ?)
-            """,
-            [
-                (
-                    r["district_name"],
-                    r["year_end"],
-                    r["contact_name"],
-                    r["contact_email"],
-                    r["source_file"],
-                )
-                for r in contact_records
-            ],
-        )
-        conn.executemany(
-            """
-            INSERT INTO desk_review_findings (
-                district_name,
-                year_end,
-                report_id,
-                finding_1_text,
-                finding_1_x,
-                finding_1_y,
-                finding_2_text,
-                finding_2_flag,
-                healthcare_pct_of_total_salary,
-                state_salary_threshold,
-                healthcare_threshold
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            [
-                (
-                    r["district_name"],
-                    r["year_end"],
-                    r["report_id"],
-                    r["finding_1_text"],
-                    r["finding_1_x"],
-                    r["finding_1_y"],
-                    r["finding_2_text"],
-                    1 if r["finding_2_flag"] else 0,
-                    r["healthcare_pct_of_total_salary"],
-                    r["state_salary_threshold"],
-                    r["healthcare_threshold"],
-                )
-                for r in desk_review_records
-            ],
-        )
+    conn = sqlite3.connect(database_path)
+    # Manage the transaction ourselves rather than letting the driver open
+    # implicit ones; using the connection in a with block rolls back on error.
+    conn.isolation_level = None
+    # The tables are rebuilt from the workbooks on every run, so trade
+    # crash durability for bulk-load speed.
+    conn.execute("PRAGMA journal_mode=MEMORY")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")
+    conn.executescript(
+        """
+        BEGIN IMMEDIATE;
+        DROP TABLE IF EXISTS cost_reports;
+        DROP TABLE IF EXISTS contact_info;
+        DROP TABLE IF EXISTS desk_review_findings;
+        """
+        + SCHEMA_SQL
+    )
+    return conn
 
 
-def export_records(records: List[dict], export_path: Path) -> None:
-    if not records:
-        raise ValueError("No records were parsed; nothing to export.")
-    df = pd.DataFrame(records)
-    export_path.parent.mkdir(parents=True, exist_ok=True)
-    if export_path.suffix.lower() == ".xlsx":
-        df.to_excel(export_path, index=False)
-    else:
-        df.to_csv(export_path, index=False)
+def create_indexes(conn: sqlite3.Connection) -> None:
+    for statement in INDEX_STATEMENTS:
+        conn.execute(statement)
 
 
-def export_contact_records(records: List[dict], export_path: Path) -> None:
-    export_records(records, export_path)
+# itertuples() yields plain Python values and sqlite3 stores NaN as NULL.
+def insert_cost_reports(conn: sqlite3.Connection, records: pd.DataFrame) -> None:
+    conn.executemany(
+        INSERT_COST_REPORT,
+        records[COST_REPORT_COLUMNS].itertuples(index=False, name=None),
+    )
+
+
+def insert_contact_info(conn: sqlite3.Connection, records: pd.DataFrame) -> None:
+    conn.executemany(
+        INSERT_CONTACT_INFO,
+        records[CONTACT_COLUMNS].itertuples(index=False, name=None),
+    )
+
+
+def insert_desk_review(conn: sqlite3.Connection, records: pd.DataFrame) -> None:
+    conn.executemany(
+        INSERT_DESK_REVIEW,
+        records[DESK_REVIEW_COLUMNS].itertuples(index=False, name=None),
+    )
+
+
+def _needs_csv_quoting(df: pd.DataFrame) -> bool:
+    if any(_CSV_SPECIAL.search(str(column)) for column in df.columns):
+        return True
+    text_columns = df.select_dtypes(include=["object", "string"])
+    return any(
+        text_columns[column].astype(str).str.contains(_CSV_SPECIAL).any()
+        for column in text_columns.columns
+    )
+
+
+class RecordExporter:
+    """Append DataFrame batches to a .csv or .xlsx export as they are produced.
+
+    Rows go to a temporary file next to the target, which replaces the export
+    only when the writer closes without an error; a failed run leaves the
+    previous export untouched.
+    """
+
+    def __init__(self, export_path: Path) -> None:
+        self.export_path = export_path
+        self._partial_path = export_path.with_name(f".{export_path.name}.partial")
+        self.rows_written = 0
+        self._handle: Optional[BinaryIO] = None
+        self._workbook: Optional[Workbook] = None
+        self._sheet = None
+
+    def __enter__(self) -> "RecordExporter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(discard=exc_type is not None)
+
+    def write(self, df: pd.DataFrame) -> None:
+        if df.empty:
+            return
+        first_batch = self.rows_written == 0
+        if first_batch:
+            self.export_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.export_path.suffix.lower() == ".xlsx":
+            self._write_xlsx(df, first_batch)
+        else:
+            self._write_csv(df, first_batch)
+        self.rows_written += len(df)
+
+    def _write_xlsx(self, df: pd.DataFrame, first_batch: bool) -> None:
+        if first_batch:
+            # A write-only workbook streams rows out instead of building every
+            # cell (and its styling) in memory the way DataFrame.to_excel does.
+            self._workbook = Workbook(write_only=True)
+            self._sheet = self._workbook.create_sheet("Sheet1")
+            self._sheet.append(list(df.columns))
+        values = df.astype(object).where(df.notna(), None)
+        for row in values.itertuples(index=False, name=None):
+            self._sheet.append(row)
+
+    def _write_csv(self, df: pd.DataFrame, first_batch: bool) -> None:
+        if first_batch:
+            self._handle = open(self._partial_path, "wb")
+        # pyarrow's C++ CSV writer is much faster than DataFrame.to_csv, but
+        # it quotes every string unless quoting is off, and with quoting off
+        # it fails part-way through on a value that needs quotes. Batches
+        # with such values, and columns with mixed Python types that cannot
+        # be converted, use pandas instead.
+        if PYARROW_AVAILABLE and not _needs_csv_quoting(df):
+            try:
+                table = pa.Table.from_pandas(df, preserve_index=False)
+            except pa.ArrowException:
+                pass
+            else:
+                options = pa_csv.WriteOptions(
+                    include_header=first_batch,
+                    quoting_style="none",
+                    quoting_header="none",
+                )
+                pa_csv.write_csv(table, self._handle, options)
+                return
+        df.to_csv(self._handle, header=first_batch, index=False)
+
+    def close(self, discard: bool = False) -> None:
+        if self._workbook is not None:
+            if not discard:
+                self._workbook.save(self._partial_path)
+            self._workbook = None
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        if not self._partial_path.exists():
+            return
+        if discard:
+            self._partial_path.unlink()
+        else:
+            self._partial_path.replace(self.export_path)
+
+
+def export_records(records: pd.DataFrame, export_path: Path) -> None:
+    if records.empty:
+        raise ValueError("No records were parsed; nothing to export.")
+    with RecordExporter(export_path) as exporter:
+        exporter.write(records)
 
 
-def export_desk_review(records: List[dict], export_path: Path) -> None:
+def export_desk_review(records: pd.DataFrame, export_path: Path) -> None:
     export_records(records, export_path)
 
 
@@ -490,6 +792,11 @@ def parse_args() -> argparse.Namespace:
         default=default_root / "desk_review_findings.csv",
         help="Path for desk review summary export (.csv or .xlsx).",
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse every workbook instead of reusing cached results.",
+    )
     return parser.parse_args()
 
 
@@ -499,30 +806,57 @@ def main() -> None:
     if not workbooks:
         raise SystemExit(f"No .xlsx files found in {args.data_dir}")
 
-    salary_records, contact_records = load_records(workbooks)
-    if not salary_records:
-        raise SystemExit("No salary rows detected in the provided workbooks.")
+    cache_dir = None if args.no_cache else Path(__file__).parent / ".cache"
+    validation_summary: Dict[str, dict] = {}
+    desk_review_frames: List[pd.DataFrame] = []
+    contact_count = 0
+
+    # Each workbook is parsed, validated, written to SQLite and appended to the
+    # exports before the next one is handled, so memory use does not grow with
+    # the number of workbooks. Only the per-report findings are kept.
+    conn = open_database(args.database)
+    try:
+        with conn, RecordExporter(args.export) as salary_export, RecordExporter(
+            args.contact_export
+        ) as contact_export:
+            for workbook, salary_rows, contact_row in iter_workbooks(
+                workbooks, cache_dir
+            ):
+                salary_rows, summary = validate_cost_reports(salary_rows, [workbook])
+                validation_summary.update(summary)
+                contact_rows = pd.DataFrame([contact_row], columns=CONTACT_COLUMNS)
+
+                insert_cost_reports(conn, salary_rows)
+                insert_contact_info(conn, contact_rows)
+                salary_export.write(salary_rows)
+                contact_export.write(contact_rows)
+                contact_count += 1
+                if not salary_rows.empty:
+                    desk_review_frames.append(perform_desk_review(salary_rows))
+
+            if not salary_export.rows_written:
+                raise SystemExit("No salary rows detected in the provided workbooks.")
+
+            desk_review_records = pd.concat(desk_review_frames, ignore_index=True)
+            insert_desk_review(conn, desk_review_records)
+            create_indexes(conn)
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
 
-    salary_records, validation_summary = validate_cost_reports(
-        salary_records, workbooks
-    )
     for file_name, info in validation_summary.items():
         if info["passed"]:
             continue
         reasons = ", ".join(sorted(set(info["errors"]))) or "Unknown reason"
         print(f"Validation failed for {file_name}: {reasons}")
 
-    desk_review_records = perform_desk_review(salary_records)
-
-    persist_to_sqlite(
-        salary_records, contact_records, desk_review_records, args.database
-    )
-    export_records(salary_records, args.export)
-    export_contact_records(contact_records, args.contact_export)
     export_desk_review(desk_review_records, args.desk_review_export)
 
-    print(f"Loaded {len(salary_records)} salary rows from {len(workbooks)} workbooks.")
-    print(f"Captured {len(contact_records)} contact rows.")
+    print(
+        f"Loaded {salary_export.rows_written} salary rows "
+        f"from {len(workbooks)} workbooks."
+    )
+    print(f"Captured {contact_count} contact rows.")
     print(f"Generated desk review summaries for {len(desk_review_records)} reports.")
     print(f"SQLite database: {args.database}")
     print(f"Combined export: {args.export}")
@@ -1,90 +1,129 @@
 import argparse
+import os
+import re
+import shutil
 import sqlite3
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Sequence
+from typing import Dict, List, Sequence, Tuple
 
 from docx2pdf import convert as docx2pdf_convert
 from docxtpl import DocxTemplate
 
+try:
+    import pythoncom
+    from win32com.client import DispatchEx
+except ImportError:  # pywin32 is only available (and only needed) on Windows.
+    DispatchEx = None
+
 
 LETTER_TEMPLATE_NAME = "desk_review_letter_template.docx"
 FINDINGS_TEMPLATE_NAME = "desk_review_findings_template.docx"
 
+# \w matches str.isalnum() characters plus "_", so this keeps letters, digits,
+# spaces, underscores and hyphens, as the per-character check used to.
+UNSAFE_FRAGMENT_CHARS = re.compile(r"[^\w \-]")
+
+WD_EXPORT_FORMAT_PDF = 17
+WD_DO_NOT_SAVE_CHANGES = 0
+# Memory-backed filesystem used for staging when it is present and has room.
+SHARED_MEMORY_DIR = Path("/dev/shm")
 
-def format_currency(value: float) -> str:
-    value = value or 0.0
-    return f"{value:,.2f}"
+# A Word instance converts one document at a time, so run this many private
+# instances side by side, each on its own thread.
+WORD_SESSIONS = 2
+# Upper bound on a LibreOffice batch: time to start plus time per document.
+SOFFICE_STARTUP_SECONDS = 120
+SOFFICE_SECONDS_PER_DOCUMENT = 60
 
 
+@lru_cache(maxsize=4096)
 def safe_fragment(text: str) -> str:
-    return "".join(ch if ch.isalnum() or ch in (" ", "_", "-") else "_" for ch in text).strip() or "district"
+    return UNSAFE_FRAGMENT_CHARS.sub("_", text).strip() or "district"
+
+
+def open_report_connection(db_path: str) -> sqlite3.Connection:
+    """Open the one connection every query helper shares for a reporting run."""
+    # Rows come back as plain tuples; the helpers unpack them by position.
+    conn = sqlite3.connect(db_path)
+    # Keep the whole working set in a ~50 MB page cache and sort in memory.
+    conn.execute("PRAGMA cache_size=-50000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
 
 
-def get_all_districts(db_path: str) -> List[str]:
-    with sqlite3.connect(db_path) as conn:
-        rows = conn.execute(
-            "SELECT DISTINCT district_name FROM cost_reports ORDER BY district_name"
-        ).fetchall()
+def get_all_districts(conn: sqlite3.Connection) -> List[str]:
+    rows = conn.execute(
+        "SELECT DISTINCT district_name FROM cost_reports ORDER BY district_name"
+    ).fetchall()
     return [row[0] for row in rows]
 
 
 def _extract_year(year_end: str) -> str:
+    # year_end is stored as an ISO date, so the year is its first four
+    # characters; anything else already fell back to the same slice.
     if not year_end:
         return ""
-    try:
-        return datetime.strptime(year_end, "%Y-%m-%d").strftime("%Y")
-    except ValueError:
-        return year_end[:4]
-
-
-def get_district_summary(db_path: str, district_name: str) -> Dict[str, float]:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        summary = conn.execute(
-            """
-            SELECT
-                district_name,
-                year_end,
-                SUM(salary * state_pct) AS state_salary_total,
-                SUM((healthcare + retirement) * state_pct) AS state_fringe_total,
-                SUM(salary * federal_pct) AS federal_salary_total,
-                SUM((healthcare + retirement) * federal_pct) AS federal_fringe_total
-            FROM cost_reports
-            WHERE district_name = ?
-            GROUP BY district_name, year_end
-            ORDER BY year_end DESC
-            LIMIT 1
-            """,
-            (district_name,),
-        ).fetchone()
-
-        if not summary:
-            raise ValueError(f"No cost report data found for {district_name}")
-
-        contact = conn.execute(
-            """
-            SELECT contact_name
-            FROM contact_info
-            WHERE district_name = ?
-            ORDER BY year_end DESC
-            LIMIT 1
-            """,
-            (district_name,),
-        ).fetchone()
-
-        position_title = contact["contact_name"] if contact and contact["contact_name"] else "Program Contact"
-
-        state_salary = summary["state_salary_total"] or 0.0
-        state_fringe = summary["state_fringe_total"] or 0.0
-        federal_salary = summary["federal_salary_total"] or 0.0
-        federal_fringe = summary["federal_fringe_total"] or 0.0
-
-        return {
-            "district_name": summary["district_name"],
+    return year_end[:4]
+
+
+def get_all_summaries(conn: sqlite3.Connection) -> Dict[str, Dict[str, float]]:
+    """Return the most recent year's summary for every district, keyed by name."""
+    # Pick each district's latest year with MAX() and sum only that year's
+    # rows, rather than summing every year and sorting to find the newest.
+    # With the (district_name, year_end DESC) index this is one ordered index
+    # scan plus an index seek per district, with no temporary sort.
+    summary_rows = conn.execute(
+        """
+        SELECT
+            district_name,
+            year_end,
+            COALESCE(SUM(salary * state_pct), 0.0) AS state_salary_total,
+            COALESCE(SUM((healthcare + retirement) * state_pct), 0.0) AS state_fringe_total,
+            COALESCE(SUM(salary * federal_pct), 0.0) AS federal_salary_total,
+            COALESCE(SUM((healthcare + retirement) * federal_pct), 0.0) AS federal_fringe_total
+        FROM cost_reports AS c
+        WHERE year_end = (
+            SELECT MAX(year_end)
+            FROM cost_reports AS c2
+            WHERE c2.district_name = c.district_name
+        )
+        GROUP BY district_name
+        """
+    ).fetchall()
+
+    # With a single MAX() aggregate, SQLite takes the bare contact_name from
+    # the row holding the latest year_end.
+    contact_rows = conn.execute(
+        """
+        SELECT district_name, contact_name, MAX(year_end)
+        FROM contact_info
+        GROUP BY district_name
+        """
+    ).fetchall()
+    contacts = {district_name: contact_name for district_name, contact_name, _ in contact_rows}
+
+    summaries: Dict[str, Dict[str, float]] = {}
+    for (
+        district_name,
+        year_end,
+        state_salary,
+        state_fringe,
+        federal_salary,
+        federal_fringe,
+    ) in summary_rows:
+        position_title = contacts.get(district_name) or "Program Contact"
+
+        summaries[district_name] = {
+            "district_name": district_name,
             "position_title": position_title,
-            "fiscal_year": _extract_year(summary["year_end"]),
+            "fiscal_year": _extract_year(year_end),
             "state_salary_total": state_salary,
             "state_fringe_total": state_fringe,
             "state_reimbursement_total": state_salary + state_fringe,
@@ -92,59 +131,176 @@ def get_district_summary(db_path: str, district_name: str) -> Dict[str, float]:
             "federal_fringe_total": federal_fringe,
             "federal_reimbursement_total": federal_salary + federal_fringe,
         }
-    finally:
-        conn.close()
+    return summaries
+
+
+def get_all_findings(conn: sqlite3.Connection) -> Dict[str, List[str]]:
+    """Return every district's finding texts, newest year first, keyed by name."""
+    # SQLite drops rows with neither finding flagged; the texts are stripped
+    # here because str.strip() removes more whitespace than SQL's TRIM. The
+    # ORDER BY matches the (district_name, year_end DESC) index and its rowid
+    # tiebreak, so the rows are read in index order without a sort.
+    rows = conn.execute(
+        """
+        SELECT
+            district_name,
+            finding_1_text,
+            finding_1_x > 0,
+            finding_2_text,
+            finding_2_flag <> 0
+        FROM desk_review_findings
+        WHERE finding_1_x > 0 OR finding_2_flag <> 0
+        ORDER BY district_name, year_end DESC, id
+        """
+    ).fetchall()
+
+    findings: Dict[str, List[str]] = {}
+    for (
+        district_name,
+        finding_1_text,
+        finding_1_reported,
+        finding_2_text,
+        finding_2_reported,
+    ) in rows:
+        district_findings = findings.setdefault(district_name, [])
+        for text, reported in (
+            (finding_1_text, finding_1_reported),
+            (finding_2_text, finding_2_reported),
+        ):
+            if reported and text and text.strip():
+                district_findings.append(text.strip())
+    return findings
 
 
-def get_district_findings(db_path: str, district_name: str) -> List[str]:
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    try:
-        rows = conn.execute(
-            """
-            SELECT
-                finding_1_text,
-                finding_1_x,
-                finding_2_text,
-                finding_2_flag
-            FROM desk_review_findings
-            WHERE district_name = ?
-            ORDER BY year_end DESC
-            """,
-            (district_name,),
-        ).fetchall()
-    finally:
-        conn.close()
-
-    findings: List[str] = []
-    for row in rows:
-        finding_1_text = row["finding_1_text"]
-        finding_1_x = row["finding_1_x"]
-        if finding_1_text and str(finding_1_text).strip() and (finding_1_x or 0) > 0:
-            findings.append(finding_1_text.strip())
-
-        finding_2_text = row["finding_2_text"]
-        finding_2_flag = row["finding_2_flag"]
-        if finding_2_text and str(finding_2_text).strip() and bool(finding_2_flag):
-            findings.append(finding_2_text.strip())
-    return findings
+@lru_cache(maxsize=None)
+def _template_bytes(template_path: Path) -> bytes:
+    # Each worker process reads a template from disk once. Rendering mutates
+    # the document, so every render still gets its own DocxTemplate.
+    return template_path.read_bytes()
 
 
 def fill_letter_template(data_dict: Dict[str, str], template_path: Path, output_path: Path) -> None:
-    template = DocxTemplate(str(template_path))
+    template = DocxTemplate(BytesIO(_template_bytes(template_path)))
     template.render(data_dict)
     template.save(str(output_path))
 
 
 def fill_findings_template(data_dict: Dict[str, str], template_path: Path, output_path: Path) -> None:
-    template = DocxTemplate(str(template_path))
+    template = DocxTemplate(BytesIO(_template_bytes(template_path)))
     template.render(data_dict)
     template.save(str(output_path))
 
 
-def convert_to_pdf(docx_path: Path, pdf_path: Path) -> None:
-    pdf_path.parent.mkdir(parents=True, exist_ok=True)
-    docx2pdf_convert(str(docx_path), str(pdf_path))
+class WordSession:
+    """Keep one private Word instance open for a batch of PDF conversions.
+
+    DispatchEx starts a separate Word process, so documents the user has open
+    in their own Word window are never touched or closed by the run.
+    """
+
+    def __enter__(self) -> "WordSession":
+        pythoncom.CoInitialize()
+        try:
+            self._word = DispatchEx("Word.Application")
+            self._word.Visible = False
+            self._word.DisplayAlerts = False
+        except Exception:
+            pythoncom.CoUninitialize()
+            raise
+        return self
+
+    def convert(self, docx_path: Path, pdf_path: Path) -> None:
+        # Word resolves relative paths against its own working directory.
+        doc = self._word.Documents.Open(str(docx_path.resolve()), ReadOnly=True)
+        try:
+            doc.ExportAsFixedFormat(str(pdf_path.resolve()), WD_EXPORT_FORMAT_PDF)
+        finally:
+            doc.Close(WD_DO_NOT_SAVE_CHANGES)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._word.Quit()
+        finally:
+            pythoncom.CoUninitialize()
+
+
+def _convert_with_word(docx_paths: Sequence[Path]) -> Dict[str, str]:
+    # WordSession initialises COM for the calling thread, so each thread
+    # drives its own Word instance. A document Word cannot open or export is
+    # recorded and skipped so the rest of the batch still converts.
+    failures: Dict[str, str] = {}
+    with WordSession() as session:
+        for docx_path in docx_paths:
+            try:
+                session.convert(docx_path, docx_path.with_suffix(".pdf"))
+            except Exception as exc:  # noqa: BLE001
+                failures[docx_path.name] = str(exc)
+    return failures
+
+
+def _convert_with_soffice(soffice: str, docx_paths: Sequence[Path], out_dir: Path) -> None:
+    # One headless LibreOffice process converts every file named on the
+    # command line, so its multi-second startup is paid once per run. It runs
+    # on a throwaway profile: with the user's own profile, an already open
+    # LibreOffice takes the request and soffice exits 0 without converting.
+    timeout = SOFFICE_STARTUP_SECONDS + SOFFICE_SECONDS_PER_DOCUMENT * len(docx_paths)
+    with tempfile.TemporaryDirectory(prefix="soffice-profile-") as profile_dir:
+        try:
+            result = subprocess.run(
+                [
+                    soffice,
+                    f"-env:UserInstallation={Path(profile_dir).as_uri()}",
+                    "--headless",
+                    "--convert-to",
+                    "pdf",
+                    "--outdir",
+                    str(out_dir),
+                ]
+                + [str(docx_path) for docx_path in docx_paths],
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"LibreOffice did not finish within {timeout} seconds") from None
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"LibreOffice exited with status {result.returncode}: {result.stderr.strip()}"
+        )
+
+
+def convert_all_to_pdf(docx_dir: Path) -> Dict[str, str]:
+    """Convert every .docx in docx_dir to a PDF beside it in one converter session.
+
+    Returns the reason for each document that failed on its own, keyed by file
+    name; an error that stops the whole converter is raised instead.
+    """
+    docx_paths = sorted(docx_dir.glob("*.docx"))
+    if not docx_paths:
+        return {}
+
+    if DispatchEx is None:
+        # docx2pdf only supports Word on Windows and macOS; elsewhere use
+        # LibreOffice when it is installed.
+        soffice = None
+        if sys.platform != "darwin":
+            soffice = shutil.which("soffice") or shutil.which("libreoffice")
+        if soffice:
+            _convert_with_soffice(soffice, docx_paths, docx_dir)
+        else:
+            # docx2pdf drives a single Word instance across the whole folder
+            # instead of starting and quitting Word for each file.
+            docx2pdf_convert(str(docx_dir), str(docx_dir))
+        return {}
+
+    batches = [docx_paths[i::WORD_SESSIONS] for i in range(WORD_SESSIONS)]
+    batches = [batch for batch in batches if batch]
+    failures: Dict[str, str] = {}
+    with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+        futures = [executor.submit(_convert_with_word, batch) for batch in batches]
+        for future in futures:
+            failures.update(future.result())
+    return failures
 
 
 def build_letter_context(summary: Dict[str, float]) -> Dict[str, str]:
@@ -153,12 +309,12 @@ def build_letter_context(summary: Dict[str, float]) -> Dict[str, str]:
         "position_title": summary["position_title"],
         "district_name": summary["district_name"],
         "fiscal_year": summary["fiscal_year"],
-        "state_salary_total": format_currency(summary["state_salary_total"]),
-        "state_fringe_total": format_currency(summary["state_fringe_total"]),
-        "state_reimbursement_total": format_currency(summary["state_reimbursement_total"]),
-        "federal_salary_total": format_currency(summary["federal_salary_total"]),
-        "federal_fringe_total": format_currency(summary["federal_fringe_total"]),
-        "federal_reimbursement_total": format_currency(summary["federal_reimbursement_total"]),
+        "state_salary_total": f"{summary['state_salary_total']:,.2f}",
+        "state_fringe_total": f"{summary['state_fringe_total']:,.2f}",
+        "state_reimbursement_total": f"{summary['state_reimbursement_total']:,.2f}",
+        "federal_salary_total": f"{summary['federal_salary_total']:,.2f}",
+        "federal_fringe_total": f"{summary['federal_fringe_total']:,.2f}",
+        "federal_reimbursement_total": f"{summary['federal_reimbursement_total']:,.2f}",
     }
     return context
 
@@ -171,6 +327,35 @@ def build_findings_context(summary: Dict[str, float], findings: Sequence[str]) -
     }
 
 
+def _render_district(
+    summary: Dict[str, float],
+    findings: Sequence[str],
+    district_folder_name: str,
+    template_paths: Tuple[Path, Path],
+    staging_dir: Path,
+) -> List[Path]:
+    letter_template, findings_template = template_paths
+    letter_context = build_letter_context(summary)
+    findings_context = build_findings_context(summary, findings)
+
+    letter_docx = staging_dir / f"desk_review_letter_{district_folder_name}.docx"
+    findings_docx = staging_dir / f"desk_review_findings_{district_folder_name}.docx"
+
+    fill_letter_template(letter_context, letter_template, letter_docx)
+    fill_findings_template(findings_context, findings_template, findings_docx)
+    return [letter_docx, findings_docx]
+
+
+def _staging_parent(output_dir_path: Path, expected_bytes: int) -> Path:
+    # The staged .docx files are only read back by the converter, so keep them
+    # in RAM where possible. /dev/shm is often small (64 MB in containers), so
+    # fall back to the output folder when the batch would not fit.
+    if SHARED_MEMORY_DIR.is_dir() and os.access(SHARED_MEMORY_DIR, os.W_OK):
+        if shutil.disk_usage(SHARED_MEMORY_DIR).free > expected_bytes:
+            return SHARED_MEMORY_DIR
+    return output_dir_path
+
+
 def generate_reports(db_path: str, template_dir: str, output_dir: str) -> None:
     template_dir_path = Path(template_dir)
     output_dir_path = Path(output_dir)
@@ -184,31 +369,116 @@ def generate_reports(db_path: str, template_dir: str, output_dir: str) -> None:
     if not findings_template.exists():
         raise FileNotFoundError(f"Missing findings template: {findings_template}")
 
-    districts = get_all_districts(db_path)
+    conn = open_report_connection(db_path)
+    try:
+        districts = get_all_districts(conn)
+        summaries = get_all_summaries(conn)
+        findings_map = get_all_findings(conn)
+    finally:
+        conn.close()
+    # Sanitise each name once; the staged file names and the district folder
+    # both use it.
+    folder_names = {district: safe_fragment(district) for district in districts}
     errors: Dict[str, str] = {}
+    rendered: Dict[str, List[Path]] = {}
 
+    # Two names can sanitise to the same folder ("St. Mary" and "St, Mary").
+    # Their staged files would overwrite each other, so only the first keeps
+    # the folder and the others are reported.
+    folder_owners: Dict[str, str] = {}
     for district in districts:
-        try:
-            summary = get_district_summary(db_path, district)
-            letter_context = build_letter_context(summary)
-            findings_context = build_findings_context(summary, get_district_findings(db_path, district))
-
-            district_folder_name = safe_fragment(district)
-            district_dir = output_dir_path / district_folder_name
-            district_dir.mkdir(parents=True, exist_ok=True)
-
-            letter_docx = district_dir / f"desk_review_letter_{district_folder_name}.docx"
-            letter_pdf = district_dir / f"desk_review_letter_{district_folder_name}.pdf"
-            findings_docx = district_dir / f"desk_review_findings_{district_folder_name}.docx"
-            findings_pdf = district_dir / f"desk_review_findings_{district_folder_name}.pdf"
-
-            fill_letter_template(letter_context, letter_template, letter_docx)
-            fill_findings_template(findings_context, findings_template, findings_docx)
-
-            convert_to_pdf(letter_docx, letter_pdf)
-            convert_to_pdf(findings_docx, findings_pdf)
-        except Exception as exc:  # noqa: BLE001
-            errors[district] = str(exc)
+        owner = folder_owners.setdefault(folder_names[district], district)
+        if owner != district:
+            errors[district] = (
+                f"Folder name '{folder_names[district]}' is already used by {owner}"
+            )
+
+    # Each district stages two documents and their PDFs, each about the size
+    # of its template.
+    expected_bytes = 2 * len(districts) * (
+        letter_template.stat().st_size + findings_template.stat().st_size
+    )
+    staging_parent = _staging_parent(output_dir_path, expected_bytes)
+
+    with tempfile.TemporaryDirectory(prefix=".staging-", dir=staging_parent) as staging:
+        staging_dir = Path(staging)
+
+        # Phase 1: render every district's documents into one flat staging
+        # folder. Districts are independent, so render them in parallel.
+        if districts:
+            template_paths = (letter_template, findings_template)
+            max_workers = min(os.cpu_count() or 1, len(districts))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                for district in districts:
+                    if district in errors:
+                        continue
+                    summary = summaries.get(district)
+                    if summary is None:
+                        errors[district] = f"No cost report data found for {district}"
+                        continue
+                    future = executor.submit(
+                        _render_district,
+                        summary,
+                        findings_map.get(district, []),
+                        folder_names[district],
+                        template_paths,
+                        staging_dir,
+                    )
+                    futures[future] = district
+                for future in as_completed(futures):
+                    try:
+                        rendered[futures[future]] = future.result()
+                    except Exception as exc:  # noqa: BLE001
+                        errors[futures[future]] = str(exc)
+
+        # Phase 2: convert the whole folder at once so Word (or the platform
+        # converter) starts a single time for all districts.
+        conversion_error = None
+        failures: Dict[str, str] = {}
+        if rendered:
+            try:
+                failures = convert_all_to_pdf(staging_dir)
+            except Exception as exc:  # noqa: BLE001
+                conversion_error = f"PDF conversion failed: {exc}"
+
+        # Phase 3: move each district's documents into its folder, along with
+        # whichever PDFs were produced. The .docx files are kept even when
+        # conversion fails, so they can be converted by hand.
+        for district, docx_paths in rendered.items():
+            district_dir = output_dir_path / folder_names[district]
+            for docx_path in docx_paths:
+                pdf_path = docx_path.with_suffix(".pdf")
+                pdf_produced = pdf_path.exists()
+                # Move each document on its own so one locked or unwritable
+                # file (e.g. an earlier PDF still open in Word) does not stop
+                # the rest of the run.
+                try:
+                    district_dir.mkdir(parents=True, exist_ok=True)
+                    shutil.move(str(docx_path), str(district_dir / docx_path.name))
+                    if pdf_produced:
+                        shutil.move(str(pdf_path), str(district_dir / pdf_path.name))
+                except OSError as exc:
+                    errors.setdefault(
+                        district, f"Could not move reports into {district_dir}: {exc}"
+                    )
+                    continue
+                if pdf_produced:
+                    continue
+                if docx_path.name in failures:
+                    errors.setdefault(
+                        district,
+                        f"PDF conversion failed for {docx_path.name}: "
+                        f"{failures[docx_path.name]}",
+                    )
+                else:
+                    errors.setdefault(
+                        district,
+                        conversion_error or f"PDF was not produced for {docx_path.name}",
+                    )
+
+    # Report errors in district order rather than completion order.
+    errors = {district: errors[district] for district in districts if district in errors}
 
     processed = len(districts) - len(errors)
     print(f"Processed {processed}/{len(districts)} districts.")